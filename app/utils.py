@@ -1,114 +1,665 @@
+import copy
+import csv
+import functools
+import importlib.util
+import io
 import json
 import os
 import hashlib
+import re
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 import logging
 
-# PDF processing imports
+logger = logging.getLogger(__name__)
+
+# PDF processing imports; each backend is optional on its own
 try:
-    import PyPDF2
-    import pdfplumber
     import fitz  # PyMuPDF
-    PDF_PROCESSING_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"PDF processing libraries not available: {e}")
-    PDF_PROCESSING_AVAILABLE = False
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
 
-logger = logging.getLogger(__name__)
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
 
-def process_pdf_content(file_path):
-    """Extract comprehensive information from PDF files."""
-    if not PDF_PROCESSING_AVAILABLE:
-        return {"error": "PDF processing libraries not available"}
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+PDF_PROCESSING_AVAILABLE = PYMUPDF_AVAILABLE or PDFIUM_AVAILABLE or PYPDF2_AVAILABLE
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# numba is slow to import and large, so it is only located here and loaded
+# by _ascii_scan_kernel() on the first text long enough to need it
+NUMBA_AVAILABLE = NUMPY_AVAILABLE and importlib.util.find_spec("numba") is not None
+
+if not PDF_PROCESSING_AVAILABLE:
+    logger.warning("PDF processing libraries not available: install PyMuPDF, pypdfium2 or PyPDF2")
+
+# Alphanumeric runs of at least three characters (underscore excluded)
+_WORD_RE = re.compile(r"[^\W_]{3,}")
+
+# Paragraph separator: a run of blank or whitespace-only lines
+_PARA_RE = re.compile(r"\n\s*\n")
+
+# Deletion table for ASCII characters that are alphanumeric or whitespace;
+# whatever survives str.translate is a special character
+_ASCII_WORD_AND_SPACE = str.maketrans('', '', ''.join(
+    chr(c) for c in range(128) if chr(c).isalnum() or chr(c).isspace()
+))
+# Same test for arbitrary Unicode: \w is isalnum() plus "_", \s is isspace()
+_SPECIAL_CHAR_RE = re.compile(r"[^\w\s]|_")
+
+# Document-name keywords used to guess the challenge type
+_FOOD_KEYWORDS = frozenset({"breakfast", "dinner", "lunch", "recipe", "food", "meal"})
+_TRAVEL_KEYWORDS = frozenset({"france", "travel", "cities", "cuisine", "hotels"})
+_HR_KEYWORDS = frozenset({"acrobat", "forms", "fillable", "hr", "onboarding", "compliance"})
+_KEYWORD_TOKEN_RE = re.compile(r"[a-z]+")
+
+# Personas that map directly to a challenge type without keyword scoring
+_PERSONA_CHALLENGE_TYPES = {
+    "food contractor": "food_contractor",
+    "hr professional": "hr_professional",
+}
+
+_TRAVEL_SECTION_MAPPINGS = {
+    "South of France - Cities.pdf": ("Comprehensive Guide to Major Cities in the South of France", 1, 1),
+    "South of France - Things to Do.pdf": ("Coastal Adventures", 2, 2),
+    "South of France - Cuisine.pdf": ("Culinary Experiences", 3, 6),
+    "South of France - Tips and Tricks.pdf": ("General Packing Tips and Tricks", 4, 2),
+    "South of France - Restaurants and Hotels.pdf": ("Dining and Accommodation", 5, 1)
+}
+
+_POSITIVE_WORDS = frozenset({'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'love', 'like'})
+_NEGATIVE_WORDS = frozenset({'bad', 'terrible', 'awful', 'hate', 'dislike', 'horrible', 'worst', 'poor'})
+
+# Whole-word sentiment matches for both classes in one pass; the named group
+# that matched tells which class a hit belongs to
+_SENTIMENT_RE = re.compile(
+    r"\b(?:(?P<positive>" + "|".join(sorted(_POSITIVE_WORDS)) + r")"
+    r"|(?P<negative>" + "|".join(sorted(_NEGATIVE_WORDS)) + r"))\b"
+)
+
+# Extracted PDF results are cached on disk, keyed by a hash of the file bytes.
+# Bump PDF_CACHE_VERSION whenever the shape or content of pdf_info changes.
+CACHE_DIR_ENV = "ADOBE_1B_CACHE_DIR"
+PDF_CACHE_VERSION = 5
+
+def _cache_dir():
+    return Path(os.environ.get(CACHE_DIR_ENV) or Path.home() / ".cache" / "adobe_1b")
+
+def _content_hash(content):
+    # BLAKE2b from hashlib: much faster than MD5, and unlike an optional package it
+    # gives the same digest on every installation
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+def _content_signature(content, content_hash=None):
+    """Short 8-hex-char fingerprint: the prefix of the content hash.
+    
+    Defined through _content_hash so a caller that already holds the hash gets
+    the same value without hashing the content again.
+    """
+    if content_hash is None:
+        content_hash = _content_hash(content)
+    return content_hash[:8]
+
+def _json_loads(content):
+    """Parse JSON this program wrote itself (cache entries) from str or bytes.
+    
+    Both parsers raise ValueError subclasses on bad input. Not for user files:
+    orjson turns integers beyond 64 bits into floats and rejects NaN/Infinity.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def parse_json_input(content):
+    """Parse a user-supplied JSON document with the standard library parser,
+    which keeps arbitrary-precision integers and accepts NaN/Infinity."""
+    return json.loads(content)
+
+def _json_dumps(data):
+    """Serialise to compact UTF-8 JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+def _pdf_cache_path(digest):
+    return _cache_dir() / f"{digest}.v{PDF_CACHE_VERSION}.json"
+
+def _write_cache_file(cache_path, payload):
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path.write_bytes(payload)
+    # Atomic rename so concurrent runs never read a half-written entry
+    os.replace(tmp_path, cache_path)
+
+def _load_cached_pdf_info(digest):
+    try:
+        return _json_loads(_pdf_cache_path(digest).read_bytes())
+    except (OSError, ValueError):
+        return None
+
+def _store_cached_pdf_info(digest, pdf_info):
+    try:
+        _write_cache_file(_pdf_cache_path(digest), _json_dumps(pdf_info))
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("Could not write PDF cache entry: %s", e)
+
+# Content digests of files already seen, one entry per absolute path. Each entry
+# records the (mtime, size) it was taken at, so on reruns an unchanged file is
+# resolved to its cache entry with a single stat() instead of being read and
+# hashed again, and a changed file overwrites its entry rather than adding one.
+_known_digests = {}
+
+def _digest_ref_path(path):
+    return _cache_dir() / "by-path" / f"{_content_hash(path)}.ref"
+
+def _stat_stamp(stat_info):
+    return f"{stat_info.st_mtime_ns}:{stat_info.st_size}"
+
+def known_content_hash(file_path, stat_info):
+    """Return the content hash recorded for file_path, or None if it changed since.
+    
+    Change is judged by modification time and size alone. A file rewritten
+    with the same size and its mtime preserved or restored (e.g. by
+    ``touch -r`` or a copy that keeps timestamps) is not detected, and the
+    recorded hash, and the cached extraction it names, go stale.
+    """
+    path = os.path.abspath(file_path)
+    entry = _known_digests.get(path)
+    if entry is None:
+        try:
+            entry = tuple(_digest_ref_path(path).read_text(encoding='ascii').split())
+        except OSError:
+            return None
+        _known_digests[path] = entry
     
+    if len(entry) != 2 or entry[0] != _stat_stamp(stat_info):
+        return None
+    return entry[1]
+
+def remember_content_hash(file_path, stat_info, digest):
+    """Record digest as the content hash of file_path in its current (mtime, size) state."""
+    path = os.path.abspath(file_path)
+    entry = (_stat_stamp(stat_info), digest)
+    if _known_digests.get(path) == entry:
+        return
+    _known_digests[path] = entry
+    try:
+        _write_cache_file(_digest_ref_path(path), " ".join(entry).encode('ascii'))
+    except OSError as e:
+        logger.warning("Could not write PDF cache reference: %s", e)
+
+def resolve_content_hash(file_path, stat_info=None):
+    """Return (digest, data) for file_path, reading it only if it changed.
+    
+    data is the file's bytes when they had to be read and hashed, and None
+    when the digest was known from the file's stat; callers hand it on so the
+    PDF backends parse from memory instead of reading the file again.
+    """
+    if stat_info is None:
+        stat_info = os.stat(file_path)
+    digest = known_content_hash(file_path, stat_info)
+    if digest is not None:
+        return digest, None
+    
+    data = Path(file_path).read_bytes()
+    digest = _content_hash(data)
+    remember_content_hash(file_path, stat_info, digest)
+    return digest, data
+
+# Sharding a document across workers only pays off for long documents
+MIN_PAGES_PER_WORKER = 32
+MAX_PAGE_WORKERS = 8
+# Set by callers that already run several extractions side by side, so the
+# per-document page pools share the machine instead of oversubscribing it
+PAGE_WORKERS_ENV = "ADOBE_1B_PAGE_WORKERS"
+
+def _page_worker_limit():
     try:
-        pdf_info = {
-            "text_content": "",
-            "page_count": 0,
-            "metadata": {},
-            "text_analysis": {},
-            "processing_method": "advanced_pdf_extraction"
+        return int(os.environ[PAGE_WORKERS_ENV])
+    except (KeyError, ValueError):
+        return min(MAX_PAGE_WORKERS, os.cpu_count() or 1)
+
+def _page_worker_count(page_count):
+    return max(1, min(_page_worker_limit(), page_count // MIN_PAGES_PER_WORKER))
+
+def _page_text(page):
+    """Return (text, word_count) for a page from a single text-page parse."""
+    # Plain-text extraction without ligature preservation (ligatures are expanded
+    # to their letters) and with hyphenated line breaks joined
+    flags = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_DEHYPHENATE | fitz.TEXT_MEDIABOX_CLIP
+    textpage = page.get_textpage(flags=flags)
+    # MuPDF's own word segmentation, which follows the layout rather than
+    # whitespace in the flattened text
+    return page.get_text("text", textpage=textpage), len(page.get_text("words", textpage=textpage))
+
+def _extract_page_range(file_path, start, stop):
+    """Extract (text, word_count) for pages [start, stop) using a private document handle."""
+    with fitz.open(file_path) as doc:
+        return [_page_text(page) for page in doc.pages(start, stop)]
+
+def _extract_pages_in_parallel(file_path, page_count, workers):
+    # MuPDF is not thread-safe, even across separate documents, so each
+    # shard runs in its own process on a contiguous page range
+    shard_size = -(-page_count // workers)
+    starts = range(0, page_count, shard_size)
+    stops = [min(start + shard_size, page_count) for start in starts]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        shards = executor.map(_extract_page_range, [file_path] * len(stops), starts, stops)
+        return [text for shard in shards for text in shard]
+
+# Extractors parse from data (the file's bytes) when the caller has them, and
+# otherwise open file_path, letting the backend read only what it needs
+
+def _extract_with_pymupdf(file_path, data, pdf_info, with_text=True):
+    doc = fitz.open(file_path) if data is None else fitz.open(stream=data, filetype="pdf")
+    with doc:
+        page_count = len(doc)
+        pdf_info["page_count"] = page_count
+        pdf_info["metadata"] = doc.metadata
+        if not with_text:
+            return
+        
+        workers = _page_worker_count(page_count)
+        parts = None
+        if workers > 1:
+            try:
+                parts = _extract_pages_in_parallel(file_path, page_count, workers)
+            except Exception as e:
+                logger.warning("Parallel page extraction failed: %s, extracting serially", e)
+        
+        # Extract text from all pages
+        if parts is None:
+            parts = [_page_text(page) for page in doc]
+        
+        pdf_info["text_content"] = "\n".join(text for text, _ in parts).strip()
+        pdf_info["native_word_count"] = sum(word_count for _, word_count in parts)
+
+def _extract_with_pdfium(file_path, data, pdf_info, with_text=True):
+    """Extract text with PDFium's range-based extractor (one C call per page)."""
+    pdf = pdfium.PdfDocument(str(file_path) if data is None else data)
+    try:
+        pdf_info["page_count"] = len(pdf)
+        
+        raw_metadata = pdf.get_metadata_dict()
+        pdf_info["metadata"] = {
+            "title": raw_metadata.get('Title', ''),
+            "author": raw_metadata.get('Author', ''),
+            "subject": raw_metadata.get('Subject', ''),
+            "creator": raw_metadata.get('Creator', ''),
+            "producer": raw_metadata.get('Producer', ''),
+            "creation_date": raw_metadata.get('CreationDate', ''),
+            "modification_date": raw_metadata.get('ModDate', '')
         }
+        if not with_text:
+            return
         
-        # Method 1: Using PyMuPDF (fitz) for comprehensive extraction
+        parts = [None] * len(pdf)
+        for index, page in enumerate(pdf):
+            textpage = page.get_textpage()
+            parts[index] = textpage.get_text_range()
+            textpage.close()
+            page.close()
+        
+        # PDFium terminates lines with CRLF; normalise to match the other backends
+        pdf_info["text_content"] = "\n".join(parts).replace("\r\n", "\n").strip()
+    finally:
+        pdf.close()
+
+def _extract_with_pypdf2(file_path, data, pdf_info, with_text=True):
+    reader = PyPDF2.PdfReader(file_path if data is None else io.BytesIO(data))
+    pdf_info["page_count"] = len(reader.pages)
+    
+    # Extract metadata
+    if reader.metadata:
+        pdf_info["metadata"] = {
+            "title": reader.metadata.get('/Title', ''),
+            "author": reader.metadata.get('/Author', ''),
+            "subject": reader.metadata.get('/Subject', ''),
+            "creator": reader.metadata.get('/Creator', ''),
+            "producer": reader.metadata.get('/Producer', ''),
+            "creation_date": str(reader.metadata.get('/CreationDate', '')),
+            "modification_date": str(reader.metadata.get('/ModDate', ''))
+        }
+    if not with_text:
+        return
+    
+    # Extract text
+    parts = [page.extract_text() for page in reader.pages]
+    pdf_info["text_content"] = "\n".join(parts).strip()
+
+def _run_pdf_extractors(file_path, data, pdf_info, with_text=True):
+    # Try the fastest installed backend first; PyPDF2 is the last resort
+    extractors = [
+        (backend_name, extractor)
+        for backend_name, extractor, available in (
+            ("PyMuPDF", _extract_with_pymupdf, PYMUPDF_AVAILABLE),
+            ("pypdfium2", _extract_with_pdfium, PDFIUM_AVAILABLE),
+            ("PyPDF2", _extract_with_pypdf2, PYPDF2_AVAILABLE),
+        )
+        if available
+    ]
+    
+    for backend_name, extractor in extractors:
         try:
-            with fitz.open(file_path) as doc:
-                pdf_info["page_count"] = len(doc)
-                pdf_info["metadata"] = doc.metadata
-                
-                # Extract text from all pages
-                full_text = ""
-                for page_num in range(len(doc)):
-                    page = doc[page_num]
-                    full_text += page.get_text() + "\n"
-                
-                pdf_info["text_content"] = full_text.strip()
-                
+            extractor(file_path, data, pdf_info, with_text)
+            pdf_info.pop("error", None)
+            break
         except Exception as e:
-            logger.warning(f"PyMuPDF extraction failed: {e}, trying PyPDF2")
-            
-            # Method 2: Fallback to PyPDF2
-            try:
-                with open(file_path, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    pdf_info["page_count"] = len(reader.pages)
-                    
-                    # Extract metadata
-                    if reader.metadata:
-                        pdf_info["metadata"] = {
-                            "title": reader.metadata.get('/Title', ''),
-                            "author": reader.metadata.get('/Author', ''),
-                            "subject": reader.metadata.get('/Subject', ''),
-                            "creator": reader.metadata.get('/Creator', ''),
-                            "producer": reader.metadata.get('/Producer', ''),
-                            "creation_date": str(reader.metadata.get('/CreationDate', '')),
-                            "modification_date": str(reader.metadata.get('/ModDate', ''))
-                        }
-                    
-                    # Extract text
-                    full_text = ""
-                    for page in reader.pages:
-                        full_text += page.extract_text() + "\n"
-                    
-                    pdf_info["text_content"] = full_text.strip()
-                    
-            except Exception as e2:
-                logger.error(f"PyPDF2 extraction also failed: {e2}")
-                pdf_info["error"] = f"Text extraction failed: {str(e2)}"
-        
-        # Analyze extracted text
-        if pdf_info["text_content"]:
-            text = pdf_info["text_content"]
-            pdf_info["text_analysis"] = {
-                "character_count": len(text),
-                "word_count": len(text.split()),
-                "line_count": len(text.splitlines()),
-                "paragraph_count": len([p for p in text.split('\n\n') if p.strip()]),
-                "avg_words_per_page": len(text.split()) / pdf_info["page_count"] if pdf_info["page_count"] > 0 else 0,
-                "has_content": len(text.strip()) > 0,
-                "content_preview": text[:500] + "..." if len(text) > 500 else text
-            }
+            logger.warning("%s extraction failed: %s", backend_name, e)
+            pdf_info["error"] = f"Text extraction failed: {str(e)}"
+    else:
+        logger.error("All PDF extraction backends failed")
+
+def _paragraph_count(text):
+    # After stripping, every separator match sits between two non-blank paragraphs
+    text = text.strip()
+    return sum(1 for _ in _PARA_RE.finditer(text)) + 1 if text else 0
+
+def _extract_pdf_info(file_path, data, digest):
+    """Full extraction and text analysis, served from the disk cache when possible.
+    
+    data may be None when the caller only had the digest; the file is then
+    only read if the cache entry is missing.
+    """
+    cached_info = _load_cached_pdf_info(digest)
+    if cached_info is not None:
+        return cached_info
+    
+    if data is None:
+        data = Path(file_path).read_bytes()
+    
+    pdf_info = {
+        "text_content": "",
+        "page_count": 0,
+        "metadata": {},
+        "text_analysis": {},
+        "processing_method": "advanced_pdf_extraction"
+    }
+    
+    _run_pdf_extractors(file_path, data, pdf_info)
+    # Set only by backends that segment words themselves
+    native_word_count = pdf_info.pop("native_word_count", None)
+    
+    # Analyze extracted text
+    if pdf_info["text_content"]:
+        text = pdf_info["text_content"]
+        page_count = pdf_info["page_count"]
+        if native_word_count is None:
+            stats = _text_statistics(text)
+            word_count = stats["word_count"]
+            line_count = stats["line_count"]
         else:
-            pdf_info["text_analysis"] = {
-                "has_content": False,
-                "extraction_status": "no_text_extracted_or_image_based_pdf"
+            # The backend counted words already; the special-character scan
+            # is not reported, so only lines are left to count
+            word_count = native_word_count
+            line_count = _line_count(text)
+        pdf_info["text_analysis"] = {
+            "character_count": len(text),
+            "word_count": word_count,
+            "line_count": line_count,
+            "paragraph_count": _paragraph_count(text),
+            "avg_words_per_page": word_count / page_count if page_count > 0 else 0,
+            "has_content": word_count > 0,
+            "content_preview": text[:500] + ("..." if len(text) > 500 else "")
+        }
+    else:
+        pdf_info["text_analysis"] = {
+            "has_content": False,
+            "extraction_status": "no_text_extracted_or_image_based_pdf"
+        }
+    
+    if "error" not in pdf_info:
+        _store_cached_pdf_info(digest, pdf_info)
+    
+    return pdf_info
+
+def process_pdf_content(file_path, mode="full", include_full_text=True, content_hash=None, data=None):
+    """Extract comprehensive information from PDF files.
+    
+    With mode="meta" only the page count and document metadata are read;
+    no content streams are decoded and the extraction cache is bypassed.
+    With include_full_text=False the extracted text is dropped from the
+    result once its statistics and preview have been computed. A caller that
+    has already read or hashed the file passes data (the file's bytes) and/or
+    content_hash so neither is done again.
+    """
+    if not PDF_PROCESSING_AVAILABLE:
+        return {"error": "PDF processing libraries not available"}
+    
+    try:
+        if mode == "meta":
+            pdf_info = {
+                "page_count": 0,
+                "metadata": {},
+                "processing_method": "pdf_metadata_extraction"
             }
+            _run_pdf_extractors(file_path, data, pdf_info, with_text=False)
+            return pdf_info
+        
+        digest = content_hash
+        if digest is None:
+            if data is None:
+                digest, data = resolve_content_hash(file_path)
+            else:
+                digest = _content_hash(data)
+        
+        pdf_info = _extract_pdf_info(file_path, data, digest)
+        
+        if not include_full_text:
+            del pdf_info["text_content"]
         
         return pdf_info
         
     except Exception as e:
-        logger.error(f"PDF processing failed: {e}")
+        logger.error("PDF processing failed: %s", e)
         return {"error": f"PDF processing failed: {str(e)}"}
 
-def extract_metadata(file_path, content):
-    try:
-        stat_info = file_path.stat()
+_WORD_STRIP_CHARS = '.,!?;:"()[]{}'
+
+# Below this size the per-call array setup costs more than the Python string methods
+VECTORIZED_MIN_TEXT_LENGTH = 4096
+
+if NUMPY_AVAILABLE:
+    # Byte lookup tables reproducing str.isspace(), str.isalnum() and the word
+    # strip() set for ASCII text
+    _ASCII_SPACE_LUT = np.array([chr(c).isspace() for c in range(128)] + [False] * 128, dtype=np.bool_)
+    _ASCII_ALNUM_LUT = np.array([chr(c).isalnum() for c in range(128)] + [False] * 128, dtype=np.bool_)
+    _WORD_STRIP_LUT = np.array([chr(c) in _WORD_STRIP_CHARS for c in range(256)], dtype=np.bool_)
+
+def _ascii_scan(buf, space_lut, alnum_lut, strip_lut):
+    """Single pass over an ASCII byte buffer.
+    
+    Returns (word_count, line_count, has_special_chars, total stripped
+    word length), matching str.split() and _line_count().
+    """
+    word_count = 0
+    line_count = 0
+    has_special = False
+    total_length = 0
+    length = 0  # bytes in the current word
+    lead = 0    # strippable bytes before the first kept byte
+    trail = 0   # strippable bytes since the last kept byte
+    kept = False
+    for b in buf:
+        if b == 0x0A:
+            line_count += 1
         
-        if isinstance(content, str):
-            content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
+        if space_lut[b]:
+            if length:
+                word_count += 1
+                if kept:
+                    total_length += length - lead - trail
+                length = lead = trail = 0
+                kept = False
         else:
-            content_hash = hashlib.md5(content).hexdigest()
+            if not alnum_lut[b]:
+                has_special = True
+            length += 1
+            if not strip_lut[b]:
+                kept = True
+                trail = 0
+            elif kept:
+                trail += 1
+            else:
+                lead += 1
+    if length:
+        word_count += 1
+        if kept:
+            total_length += length - lead - trail
+    # A trailing line without a terminator still counts
+    if len(buf) and buf[len(buf) - 1] != 0x0A:
+        line_count += 1
+    return word_count, line_count, has_special, total_length
+
+@functools.lru_cache(maxsize=None)
+def _ascii_scan_kernel():
+    """numba-compiled _ascii_scan, built on first use; None if numba will not load."""
+    if not NUMBA_AVAILABLE:
+        return None
+    try:
+        import numba
+    except ImportError as e:
+        logger.warning(f"numba could not be loaded: {e}")
+        return None
+    return numba.njit(cache=True)(_ascii_scan)
+
+def _scan_ascii_text(text):
+    """Run the compiled kernel over ASCII text; None when it is unavailable."""
+    kernel = _ascii_scan_kernel()
+    if kernel is None:
+        return None
+    buf = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    return kernel(buf, _ASCII_SPACE_LUT, _ASCII_ALNUM_LUT, _WORD_STRIP_LUT)
+
+def _line_count(text):
+    """Newline-terminated lines, plus a final unterminated one; no per-line strings."""
+    return text.count('\n') + (1 if text and not text.endswith('\n') else 0)
+
+def _has_special_chars(text):
+    if text.isascii():
+        return bool(text.translate(_ASCII_WORD_AND_SPACE))
+    return _SPECIAL_CHAR_RE.search(text) is not None
+
+def _ascii_text_statistics(text):
+    """Vectorised equivalent of the Python branch of _text_statistics for ASCII text."""
+    buf = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    space = _ASCII_SPACE_LUT[buf]
+    
+    # A word starts at every non-space byte preceded by a space (or the start)
+    word_count = np.count_nonzero(space[:-1] & ~space[1:]) + (not space[0])
+    
+    return {
+        "character_count": buf.size,
+        "word_count": int(word_count),
+        "line_count": _line_count(text),
+        "has_special_chars": bool(np.any(~_ASCII_ALNUM_LUT[buf] & ~space)),
+    }
+
+def _text_statistics(text):
+    """Character, word and line counts plus the special-character flag."""
+    if NUMPY_AVAILABLE and len(text) >= VECTORIZED_MIN_TEXT_LENGTH and text.isascii():
+        scan = _scan_ascii_text(text)
+        if scan is not None:
+            word_count, line_count, has_special_chars, _ = scan
+            return {
+                "character_count": len(text),
+                "word_count": word_count,
+                "line_count": line_count,
+                "has_special_chars": bool(has_special_chars),
+            }
+        return _ascii_text_statistics(text)
+    
+    return {
+        "character_count": len(text),
+        "word_count": len(text.split()),
+        "line_count": _line_count(text),
+        "has_special_chars": _has_special_chars(text),
+    }
+
+# In-process memo of content-derived analysis, keyed by (kind, content hash, file type)
+ANALYSIS_CACHE_SIZE = 1024
+_analysis_cache = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+def _cached_analysis(kind, content, file_type, compute, content_hash=None):
+    """Return compute(content, file_type), reusing earlier results for identical content.
+    
+    content_hash is the hash of the raw bytes content was decoded from, when
+    the caller has it; the text is then not hashed again. Decoding is
+    deterministic, so equal bytes always give equal text, but the two hashes
+    differ for the same input and are kept apart in the key.
+    """
+    if content_hash is not None:
+        key = (kind, "bytes", content_hash, file_type)
+    else:
+        key = (kind, "text", _content_hash(content), file_type)
+    with _analysis_cache_lock:
+        result = _analysis_cache.get(key)
+        if result is not None:
+            _analysis_cache.move_to_end(key)
+    
+    if result is None:
+        result = compute(content, file_type)
+        with _analysis_cache_lock:
+            _analysis_cache[key] = result
+            if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+                _analysis_cache.popitem(last=False)
+    
+    # Callers merge and serialise the result, so never hand out the cached object
+    return copy.deepcopy(result)
+
+def _csv_shape(content):
+    """Return (row_count, column_count) by streaming records, honouring quoted commas."""
+    reader = csv.reader(io.StringIO(content, newline=''))
+    try:
+        header = next(reader, None)
+        if header is None:
+            return 0, 0
+        return 1 + sum(1 for _ in reader), len(header)
+    except csv.Error:
+        # Malformed CSV: fall back to a plain line/comma estimate
+        first_newline = content.find('\n')
+        header = content if first_newline < 0 else content[:first_newline]
+        return _line_count(content), header.count(',') + 1 if content else 0
+
+def extract_metadata(file_path, content, raw_bytes=None, stat_info=None, content_hash=None):
+    """Describe a file. raw_bytes, when given, is the buffer content was decoded
+    from and is hashed directly instead of re-encoding a str. stat_info and
+    content_hash, when given, are an os.stat_result and content hash the
+    caller already holds for file_path."""
+    try:
+        if stat_info is None:
+            stat_info = file_path.stat()
+        
+        if content_hash is None:
+            content_hash = _content_hash(content if raw_bytes is None else raw_bytes)
         
         metadata = {
             "file_size": stat_info.st_size,
@@ -122,69 +673,110 @@ def extract_metadata(file_path, content):
         return metadata
         
     except Exception as e:
-        logger.error(f"Error extracting metadata: {str(e)}")
+        logger.error("Error extracting metadata: %s", e)
         return {"error": str(e)}
 
-def analyze_file_content(content, file_type, file_path=None):
+# Default for parsed_json arguments: the caller has not parsed the document.
+# None cannot serve, since it is what a JSON "null" document parses to.
+_UNPARSED = object()
+
+def _json_structure(content, parsed_json=_UNPARSED):
+    try:
+        if parsed_json is _UNPARSED:
+            parsed_json = parse_json_input(content)
+    except ValueError:
+        return {"is_valid_json": False}
+    
+    return {
+        "is_valid_json": True,
+        "top_level_type": type(parsed_json).__name__,
+        "key_count": len(parsed_json) if isinstance(parsed_json, dict) else "N/A"
+    }
+
+def _analyze_text_content(content, file_type):
+    analysis = _text_statistics(content)
+    
+    if file_type == '.csv':
+        row_count, column_count = _csv_shape(content)
+        analysis["csv_structure"] = {
+            "estimated_rows": row_count,
+            "estimated_columns": column_count,
+            "has_header": True  # Assumption
+        }
+    
+    return analysis
+
+def _process_text_content(content, file_type):
+    if file_type == '.csv':
+        row_count, _ = _csv_shape(content)
+        sample_lines = islice(io.StringIO(content, newline=None), 3)
+        return {
+            "row_count": row_count,
+            "sample_data": [line.rstrip('\n') for line in sample_lines],
+            "processing_status": "basic_analysis_complete"
+        }
+    
+    # Lowercase once; frequency, sentiment and vocabulary all work on the same copy
+    content_lower = content.lower()
+    return {
+        "text_processing": {
+            "word_frequency": calculate_word_frequency(content_lower, lowercased=True),
+            "sentiment_indicators": detect_sentiment_indicators(content_lower, lowercased=True),
+            "text_statistics": {
+                "avg_word_length": calculate_avg_word_length(content),
+                "unique_words": len(set(content_lower.split()))
+            }
+        }
+    }
+
+def analyze_file_content(content, file_type, file_path=None, text_analysis=True, include_full_text=True,
+                         content_hash=None, parsed_json=_UNPARSED):
     try:
         analysis = {
             "content_type": file_type,
             "size_analysis": {}
         }
         
-        # Special handling for PDF files
+        # Special handling for PDF files; page text is only extracted when text
+        # analysis is wanted, otherwise page count and metadata are enough
         if file_type == '.pdf' and file_path:
-            pdf_analysis = process_pdf_content(file_path)
+            # The caller's raw bytes, when it has them, spare a second read on a cache miss
+            pdf_analysis = process_pdf_content(
+                file_path,
+                mode="full" if text_analysis else "meta",
+                include_full_text=include_full_text,
+                content_hash=content_hash,
+                data=content if isinstance(content, bytes) else None
+            )
             analysis.update(pdf_analysis)
             return analysis
         
         elif file_type in ['.txt', '.json', '.csv', '.md']:
             if isinstance(content, str):
-                analysis.update({
-                    "character_count": len(content),
-                    "word_count": len(content.split()),
-                    "line_count": len(content.splitlines()),
-                    "has_special_chars": any(not c.isalnum() and not c.isspace() for c in content),
-                })
-                
+                analysis.update(_cached_analysis("analysis", content, file_type, _analyze_text_content, content_hash))
                 if file_type == '.json':
-                    try:
-                        parsed_json = json.loads(content)
-                        analysis["json_structure"] = {
-                            "is_valid_json": True,
-                            "top_level_type": type(parsed_json).__name__,
-                            "key_count": len(parsed_json) if isinstance(parsed_json, dict) else "N/A"
-                        }
-                    except json.JSONDecodeError:
-                        analysis["json_structure"] = {"is_valid_json": False}
-                        
-                elif file_type == '.csv':
-                    lines = content.splitlines()
-                    analysis["csv_structure"] = {
-                        "estimated_rows": len(lines),
-                        "estimated_columns": len(lines[0].split(',')) if lines else 0,
-                        "has_header": True  # Assumption
-                    }
+                    # Outside the memo: a caller that parsed the document already passes it in
+                    analysis["json_structure"] = _json_structure(content, parsed_json)
         
         elif file_type in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']:
             analysis.update({
                 "is_image": True,
-                "size_bytes": len(content) if isinstance(content, bytes) else len(content.encode())
+                "size_bytes": len(content.encode()) if isinstance(content, str) else len(content)
             })
             
         else:
             analysis.update({
                 "is_binary": True,
-                "size_bytes": len(content) if isinstance(content, bytes) else len(content.encode())
+                "size_bytes": len(content.encode()) if isinstance(content, str) else len(content)
             })
         
         return analysis
         
     except Exception as e:
-        logger.error(f"Error analyzing content: {str(e)}")
+        logger.error("Error analyzing content: %s", e)
         return {"error": str(e)}
 
-def process_data(content, file_type):
+def process_data(content, file_type, content_hash=None, parsed_json=_UNPARSED):
     try:
         processed = {
             "processing_method": f"standard_{file_type.replace('.', '')}_processing",
@@ -193,7 +785,7 @@ def process_data(content, file_type):
         
         if file_type == '.json':
             try:
-                parsed_data = json.loads(content)
+                parsed_data = parse_json_input(content) if parsed_json is _UNPARSED else parsed_json
                 
                 # Check if this is a challenge input file
                 if "challenge_info" in parsed_data and "documents" in parsed_data:
@@ -204,45 +796,26 @@ def process_data(content, file_type):
                     "data_summary": generate_json_summary(parsed_data),
                     "validation_status": "valid"
                 })
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 processed.update({
                     "parsed_successfully": False,
                     "error": str(e),
                     "validation_status": "invalid"
                 })
                 
-        elif file_type == '.csv':
-            lines = content.splitlines()
-            processed.update({
-                "row_count": len(lines),
-                "sample_data": lines[:3] if len(lines) > 0 else [],
-                "processing_status": "basic_analysis_complete"
-            })
-            
-        elif file_type == '.txt':
-            processed.update({
-                "text_processing": {
-                    "word_frequency": calculate_word_frequency(content),
-                    "sentiment_indicators": detect_sentiment_indicators(content),
-                    "text_statistics": {
-                        "avg_word_length": calculate_avg_word_length(content),
-                        "unique_words": len(set(content.lower().split()))
-                    }
-                }
-            })
+        elif file_type in ['.csv', '.txt']:
+            processed.update(_cached_analysis("processing", content, file_type, _process_text_content, content_hash))
             
         else:
             processed.update({
                 "generic_processing": True,
-                "content_signature": hashlib.md5(
-                    content.encode() if isinstance(content, str) else content
-                ).hexdigest()[:8]
+                "content_signature": _content_signature(content, content_hash)
             })
         
         return processed
         
     except Exception as e:
-        logger.error(f"Error processing data: {str(e)}")
+        logger.error("Error processing data: %s", e)
         return {"error": str(e)}
 
 def generate_json_summary(data):
@@ -298,25 +871,20 @@ def process_challenge_data(data):
             return generate_travel_planner_output(metadata, input_documents)
         
     except Exception as e:
-        logger.error(f"Error processing challenge data: {str(e)}")
+        logger.error("Error processing challenge data: %s", e)
         return {"error": str(e)}
 
 def determine_challenge_type(input_documents, persona):
     """Determine the type of challenge based on documents and persona"""
-    food_keywords = ["breakfast", "dinner", "lunch", "recipe", "food", "meal"]
-    travel_keywords = ["france", "travel", "cities", "cuisine", "hotels"]
-    hr_keywords = ["acrobat", "forms", "fillable", "hr", "onboarding", "compliance"]
-    
-    if persona.lower() == "food contractor":
-        return "food_contractor"
-    elif persona.lower() == "hr professional":
-        return "hr_professional"
+    persona_type = _PERSONA_CHALLENGE_TYPES.get(persona.lower())
+    if persona_type:
+        return persona_type
     
     # Check document names for keywords
-    doc_text = " ".join(input_documents).lower()
-    food_score = sum(1 for keyword in food_keywords if keyword in doc_text)
-    travel_score = sum(1 for keyword in travel_keywords if keyword in doc_text)
-    hr_score = sum(1 for keyword in hr_keywords if keyword in doc_text)
+    tokens = set(_KEYWORD_TOKEN_RE.findall(" ".join(input_documents).lower()))
+    food_score = len(_FOOD_KEYWORDS & tokens)
+    travel_score = len(_TRAVEL_KEYWORDS & tokens)
+    hr_score = len(_HR_KEYWORDS & tokens)
     
     if hr_score > max(food_score, travel_score):
         return "hr_professional"
@@ -400,17 +968,10 @@ def generate_travel_planner_output(metadata, input_documents):
     """Generate travel planner specific output"""
     # Generate extracted sections (simulated based on document names)
     extracted_sections = []
-    section_mappings = {
-        "South of France - Cities.pdf": ("Comprehensive Guide to Major Cities in the South of France", 1, 1),
-        "South of France - Things to Do.pdf": ("Coastal Adventures", 2, 2),
-        "South of France - Cuisine.pdf": ("Culinary Experiences", 3, 6),
-        "South of France - Tips and Tricks.pdf": ("General Packing Tips and Tricks", 4, 2),
-        "South of France - Restaurants and Hotels.pdf": ("Dining and Accommodation", 5, 1)
-    }
     
     for i, doc_name in enumerate(input_documents[:5]):  # Top 5 sections
-        if doc_name in section_mappings:
-            title, rank, page = section_mappings[doc_name]
+        if doc_name in _TRAVEL_SECTION_MAPPINGS:
+            title, rank, page = _TRAVEL_SECTION_MAPPINGS[doc_name]
             extracted_sections.append({
                 "document": doc_name,
                 "section_title": title,
@@ -462,43 +1023,47 @@ def generate_travel_planner_output(metadata, input_documents):
         "subsection_analysis": subsection_analysis
     }
 
-def calculate_word_frequency(text):
+def _word_frequency(text_lower):
+    return dict(Counter(_WORD_RE.findall(text_lower)).most_common(5))
+
+def calculate_word_frequency(text, lowercased=False):
     try:
-        words = text.lower().split()
-        word_count = {}
-        for word in words:
-            clean_word = ''.join(c for c in word if c.isalnum())
-            if clean_word and len(clean_word) > 2:
-                word_count[clean_word] = word_count.get(clean_word, 0) + 1
-        
-        return dict(sorted(word_count.items(), key=lambda x: x[1], reverse=True)[:5])
+        return _word_frequency(text if lowercased else text.lower())
     except Exception:
         return {}
 
-def detect_sentiment_indicators(text):
+def _sentiment_indicators(text_lower):
+    counts = Counter(match.lastgroup for match in _SENTIMENT_RE.finditer(text_lower))
+    positive_count = counts["positive"]
+    negative_count = counts["negative"]
+    
+    return {
+        "positive_indicators": positive_count,
+        "negative_indicators": negative_count,
+        "sentiment_score": positive_count - negative_count
+    }
+
+def detect_sentiment_indicators(text, lowercased=False):
     try:
-        positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'love', 'like']
-        negative_words = ['bad', 'terrible', 'awful', 'hate', 'dislike', 'horrible', 'worst', 'poor']
-        
-        text_lower = text.lower()
-        
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-        
-        return {
-            "positive_indicators": positive_count,
-            "negative_indicators": negative_count,
-            "sentiment_score": positive_count - negative_count
-        }
+        return _sentiment_indicators(text if lowercased else text.lower())
     except Exception:
         return {"error": "Unable to analyze sentiment"}
 
 def calculate_avg_word_length(text):
     try:
+        # The byte kernel only matches str.split() semantics for ASCII text
+        if NUMBA_AVAILABLE and len(text) >= VECTORIZED_MIN_TEXT_LENGTH and text.isascii():
+            scan = _scan_ascii_text(text)
+            if scan is not None:
+                word_count, _, _, total_length = scan
+                if not word_count:
+                    return 0
+                return round(total_length / word_count, 2)
+        
         words = text.split()
         if not words:
             return 0
-        total_length = sum(len(word.strip('.,!?;:"()[]{}')) for word in words)
+        total_length = sum(len(word.strip(_WORD_STRIP_CHARS)) for word in words)
         return round(total_length / len(words), 2)
     except Exception:
         return 0
@@ -2,17 +2,39 @@
 
 import os
 import json
+import mmap
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 import logging
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+# Imported after logging is configured so warnings raised while loading the
+# optional accelerators and PDF backends use the format above
+from app.utils import (
+    CACHE_DIR_ENV,
+    PAGE_WORKERS_ENV,
+    analyze_file_content,
+    extract_metadata,
+    known_content_hash,
+    parse_json_input,
+    process_data,
+    remember_content_hash,
+    resolve_content_hash,
+)
+
 def setup_directories():
     input_dir = Path("input")
     output_dir = Path("output")
@@ -20,53 +42,213 @@ def setup_directories():
     input_dir.mkdir(exist_ok=True)
     output_dir.mkdir(exist_ok=True)
     
+    # Keep the extraction cache next to the results so it survives container reruns
+    os.environ.setdefault(CACHE_DIR_ENV, str(output_dir / ".cache"))
+    
     return input_dir, output_dir
 
+def _output_path(input_file, output_dir):
+    if input_file.suffix.lower() == '.json':
+        return output_dir / f"{input_file.stem}_processed.json"
+    return output_dir / f"{input_file.stem}.json"
+
+def write_result(output_file, result, embeds_user_json=False):
+    """Write a report as indented UTF-8 JSON, serialised by orjson when installed.
+    
+    Reports that embed values from a user's JSON document use the standard
+    library: orjson cannot represent integers beyond 64 bits and writes NaN
+    and Infinity as null.
+    """
+    if ORJSON_AVAILABLE and not embeds_user_json:
+        output_file.write_bytes(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+def _process_and_write(input_file, output_dir, stat_info=None):
+    """Process one input file and write its report; module-level so worker processes can pickle it."""
+    try:
+        logger.info("Processing %s...", input_file.name)
+        
+        result = process_single_file(input_file, stat_info)
+        
+        output_file = _output_path(input_file, output_dir)
+        write_result(output_file, result, embeds_user_json=input_file.suffix.lower() == '.json')
+        
+        logger.info("Successfully processed %s -> %s", input_file.name, output_file.name)
+        
+    except Exception as e:
+        logger.error("Error processing %s: %s", input_file.name, e)
+
+def _process_and_write_group(files, output_dir):
+    """Process byte-identical files one after another in a single worker.
+    
+    The first extracts the content and stores its cache entry; the rest are
+    served from that entry instead of repeating the extraction.
+    """
+    for input_file, stat_info in files:
+        _process_and_write(input_file, output_dir, stat_info)
+
+def group_identical_pdfs(pdf_files):
+    """Group (path, stat_result) pairs by content hash, preserving scan order.
+    
+    Files whose stat is unchanged since an earlier run are matched by it;
+    the rest are read and hashed, and their digests are recorded so the
+    workers do not hash them again.
+    """
+    groups = {}
+    for input_file, stat_info in pdf_files:
+        try:
+            key, _ = resolve_content_hash(input_file, stat_info)
+        except OSError as e:
+            # Left on its own; the worker reports the error in its output
+            logger.warning("Could not hash %s: %s", input_file.name, e)
+            key = input_file
+        groups.setdefault(key, []).append((input_file, stat_info))
+    return list(groups.values())
+
+def _init_pdf_worker(page_workers):
+    os.environ[PAGE_WORKERS_ENV] = str(page_workers)
+
+def iter_input_files(input_dir):
+    """Yield (path, stat_result) for every regular file with an extension.
+    
+    The stat result is captured once here and handed down, so processing a
+    file does not stat it again.
+    """
+    with os.scandir(input_dir) as entries:
+        for entry in entries:
+            if '.' in entry.name and entry.is_file():
+                yield Path(entry.path), entry.stat()
+
 def process_files(input_dir, output_dir):
-    input_files = list(input_dir.glob("*.*"))
+    # PDF extraction is CPU-bound and holds the GIL, so PDFs go to separate
+    # processes; the remaining formats are cheap and mostly I/O, so threads suffice.
+    # Partition while scanning rather than listing the directory first.
+    pdf_files = []
+    other_files = []
+    for input_file, stat_info in iter_input_files(input_dir):
+        if input_file.suffix.lower() == '.pdf':
+            pdf_files.append((input_file, stat_info))
+        else:
+            other_files.append((input_file, stat_info))
+    
+    file_count = len(pdf_files) + len(other_files)
+    if not file_count:
+        logger.warning("No input files found in %s", input_dir)
+        return
     
-    if not input_files:
-        logger.warning(f"No input files found in {input_dir}")
+    logger.info("Found %s input files to process", file_count)
+    
+    if file_count == 1:
+        input_file, stat_info = (pdf_files or other_files)[0]
+        _process_and_write(input_file, output_dir, stat_info)
         return
     
-    logger.info(f"Found {len(input_files)} input files to process")
+    # Byte-identical PDFs would otherwise be extracted side by side in
+    # separate processes; each group is dispatched as one task instead
+    if len(pdf_files) > 1 and PDF_TEXT_ANALYSIS:
+        pdf_groups = group_identical_pdfs(pdf_files)
+    else:
+        pdf_groups = [[pdf_file] for pdf_file in pdf_files]
+    
+    cpu_count = os.cpu_count() or 1
+    pdf_workers = max(1, min(len(pdf_groups), cpu_count))
+    # Split the cores between concurrently processed PDFs for their page shards
+    with ProcessPoolExecutor(max_workers=pdf_workers, initializer=_init_pdf_worker,
+                             initargs=(max(1, cpu_count // pdf_workers),)) as process_pool, \
+         ThreadPoolExecutor(max_workers=max(1, min(len(other_files), cpu_count))) as thread_pool:
+        futures = [process_pool.submit(_process_and_write_group, group, output_dir) for group in pdf_groups]
+        futures += [thread_pool.submit(_process_and_write, p, output_dir, st) for p, st in other_files]
+        for future in as_completed(futures):
+            future.result()
+
+# Set ADOBE_1B_PDF_TEXT_ANALYSIS=0 to report only page counts and document
+# metadata for PDFs, skipping page text extraction entirely
+PDF_TEXT_ANALYSIS = os.environ.get("ADOBE_1B_PDF_TEXT_ANALYSIS", "1") != "0"
+
+# Smaller files are read outright; one read() is cheaper than setting up a mapping
+MMAP_MIN_SIZE = 1 << 20
+
+def map_file(f):
+    """Memory-map an open binary file read-only; empty files map to b""."""
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:  # mmap refuses zero-length files
+        return b""
+
+def read_input(file_path, size):
+    """Return the file's bytes, memory-mapped when it is at least MMAP_MIN_SIZE.
     
-    for input_file in input_files:
+    PDFs are always read outright: the PDF backends only parse from a bytes
+    object, and handing them these bytes saves a second read on a cache miss.
+    """
+    if size < MMAP_MIN_SIZE or file_path.suffix.lower() == '.pdf':
+        return file_path.read_bytes()
+    # The mapping stays valid after the file object is closed
+    with open(file_path, 'rb') as f:
+        return map_file(f)
+
+def decode_text(raw):
+    # Decode the raw bytes once, then apply the newline translation text-mode
+    # open() used to do; undecodable bytes become U+FFFD instead of failing the file
+    text = str(raw, 'utf-8', errors='replace')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def process_single_file(file_path, stat_info=None):
+    try:
+        if stat_info is None:
+            stat_info = file_path.stat()
+        
+        is_pdf = file_path.suffix.lower() == '.pdf'
+        # An unchanged PDF resolves to its extraction cache entry from its stat
+        # alone; the file is then only read if that entry is missing. The
+        # reported file_hash is then the recorded one, not a fresh hash of the
+        # bytes (see known_content_hash for when it can be stale)
+        content_hash = known_content_hash(file_path, stat_info) if is_pdf else None
+        raw = None if content_hash else read_input(file_path, stat_info.st_size)
         try:
-            logger.info(f"Processing {input_file.name}...")
+            # Binary files are analysed straight from the raw buffer; large ones are
+            # mapped, so the OS pages data in on demand
+            if raw is None:
+                content = None
+            elif file_path.suffix.lower() in ['.txt', '.json', '.csv']:
+                content = decode_text(raw)
+            else:
+                content = raw
             
-            result = process_single_file(input_file)
+            metadata = extract_metadata(
+                file_path, content, raw_bytes=raw, stat_info=stat_info, content_hash=content_hash
+            )
             
-            if input_file.suffix.lower() == '.json':
-                output_file = output_dir / f"{input_file.stem}_processed.json"
-            else:
-                output_file = output_dir / f"{input_file.stem}.json"
+            # Hash the bytes once; PDF extraction and the generic signature reuse it
+            content_hash = metadata.get("file_hash")
+            if is_pdf and raw is not None and content_hash:
+                remember_content_hash(file_path, stat_info, content_hash)
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            # Parse a JSON document once for both the analysis and the processing
+            # step; an invalid one is left to each of them to report
+            json_kwargs = {}
+            if file_path.suffix.lower() == '.json':
+                try:
+                    json_kwargs["parsed_json"] = parse_json_input(content)
+                except ValueError:
+                    pass
             
-            logger.info(f"Successfully processed {input_file.name} -> {output_file.name}")
+            analysis_result = analyze_file_content(
+                content, file_path.suffix.lower(), file_path,
+                text_analysis=PDF_TEXT_ANALYSIS, content_hash=content_hash, **json_kwargs
+            )
             
-        except Exception as e:
-            logger.error(f"Error processing {input_file.name}: {str(e)}")
-            continue
-
-def process_single_file(file_path):
-    from app.utils import analyze_file_content, extract_metadata, process_data
-    
-    try:
-        if file_path.suffix.lower() in ['.txt', '.json', '.csv']:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        else:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-        
-        metadata = extract_metadata(file_path, content)
-        
-        analysis_result = analyze_file_content(content, file_path.suffix.lower(), file_path)
-        
-        processed_data = process_data(content, file_path.suffix.lower())
+            processed_data = process_data(
+                content, file_path.suffix.lower(), content_hash=content_hash, **json_kwargs
+            )
+        finally:
+            if isinstance(raw, mmap.mmap):
+                raw.close()
         
         # Special handling for challenge data - output directly in desired format
         if (file_path.suffix.lower() == '.json' and 
@@ -77,7 +259,7 @@ def process_single_file(file_path):
         else:
             result = {
                 "filename": file_path.name,
-                "file_size": file_path.stat().st_size,
+                "file_size": stat_info.st_size,
                 "file_type": file_path.suffix.lower(),
                 "status": "success",
                 "metadata": metadata,
@@ -89,7 +271,7 @@ def process_single_file(file_path):
         return result
         
     except Exception as e:
-        logger.error(f"Error processing {file_path.name}: {str(e)}")
+        logger.error("Error processing %s: %s", file_path.name, e)
         return {
             "filename": file_path.name,
             "status": "error",
@@ -108,7 +290,7 @@ def main():
         logger.info("Processing completed successfully!")
         
     except Exception as e:
-        logger.error(f"Fatal error: {str(e)}")
+        logger.error("Fatal error: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":